@@ -8,24 +8,32 @@
 # using the TransnetTender model, and then sends it to an Amazon SQS queue for further processing.
 #
 # The function performs the following steps:
-# 1. Fetches tender data from the Transnet API endpoint.
+# 1. Fetches tender data from the Transnet API endpoint as a stream.
 # 2. Handles potential network errors or invalid API responses.
-# 3. Extracts the list of tenders from the nested 'result' key in the API response.
-# 4. Iterates through each tender item.
-# 5. Validates and parses each item into a structured TransnetTender object.
+# 3. Incrementally parses the list of tenders from the nested 'result' key in the API response.
+# 4. Iterates through each tender item as it is parsed.
+# 5. Validates and cleans each item directly into the dictionary format of the TransnetTender model.
 # 6. Skips and logs any items that fail validation.
-# 7. Converts the processed tender objects into dictionaries.
-# 8. Batches the tender data into groups of 10.
-# 9. Sends each batch to a specified SQS FIFO queue with a unique MessageGroupId.
-# 10. Logs the outcome of the operation.
+# 7. Batches the tender data into groups of 10 while the response is still streaming.
+# 8. Sends each batch, as soon as it is full, concurrently to a specified SQS FIFO queue with a
+#    unique MessageGroupId.
+# 9. Logs the outcome of the operation.
 #
 # ==================================================================================================
 
 # --- Import necessary libraries ---
+import hashlib
 import json
+import orjson
+import ijson
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 import logging
-import boto3
+import threading
+import botocore.session
+from botocore.config import Config
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from models import TransnetTender # Import the data model for Transnet tenders.
 
 # --- Global Constants and Configuration ---
@@ -38,14 +46,153 @@ HEADERS = {
     'Accept': 'application/json',
 }
 
+# --- HTTP Session Initialization ---
+# A module-level session is reused across warm invocations of the same Lambda container,
+# so the keep-alive connection to the API avoids a new TCP and TLS handshake on each run.
+http_session = requests.Session()
+http_session.headers.update(HEADERS)
+http_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 # --- Logger Setup ---
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # --- AWS Service Client Initialization ---
-sqs_client = boto3.client('sqs')
 # The URL of the target SQS FIFO queue. This is the same queue used by other lambdas.
 SQS_QUEUE_URL = 'https://sqs.us-east-1.amazonaws.com/211635102441/AIQueue.fifo'
+# A specific MessageGroupId for Transnet. Order is kept within a batch, but not across batches,
+# since the batches are sent in parallel.
+SQS_MESSAGE_GROUP_ID = 'TransnetTenderScrape'
+# Prefix for MessageDeduplicationIds, which must not collide with those of other sources on the queue.
+SQS_DEDUPLICATION_ID_PREFIX = 'transnet-'
+# The maximum number of messages per SQS batch (the SQS limit for send_message_batch).
+SQS_BATCH_SIZE = 10
+# Entry IDs only need to be unique within a batch, so every batch reuses the same precomputed IDs.
+SQS_ENTRY_IDS = tuple(str(i) for i in range(SQS_BATCH_SIZE))
+# The maximum number of SQS batches sent concurrently.
+SQS_MAX_WORKERS = 10
+# The maximum number of batches submitted but not yet sent. This bounds the memory held by
+# serialized batches waiting for a free worker while the API response is still streaming.
+SQS_MAX_PENDING_BATCHES = 2 * SQS_MAX_WORKERS
+# The client is created from a plain botocore session rather than boto3, which skips loading
+# boto3's resource layer during cold start; SQS is the only AWS service this function uses.
+botocore_session = botocore.session.Session()
+SQS_CLIENT_CONFIG = Config(
+    # Retry throttling and transient network errors with exponential backoff. Adaptive mode
+    # also rate-limits the client when SQS signals throttling, which matters with parallel sends.
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    # Keep idle connections alive between warm invocations.
+    tcp_keepalive=True,
+    # One pooled connection per concurrent send.
+    max_pool_connections=SQS_MAX_WORKERS,
+)
+# The region is set explicitly (it matches the queue URL) to skip the region lookup.
+sqs_client = botocore_session.create_client('sqs', region_name='us-east-1', config=SQS_CLIENT_CONFIG)
+# The maximum number of seconds Lambda init waits for the SQS priming call.
+SQS_PRIMING_TIMEOUT = 3
+
+def _prime_sqs_client():
+    """
+    Makes a cheap SQS call so that sqs_client opens its HTTPS connection during init.
+    """
+    try:
+        sqs_client.get_queue_attributes(QueueUrl=SQS_QUEUE_URL, AttributeNames=['QueueArn'])
+    except Exception as e:
+        # Priming is only an optimization; the handler will still work without it.
+        logger.warning(f"Failed to prime the SQS client: {e}")
+
+# Prime sqs_client during init so the TCP and TLS handshake for its connection pool is paid in
+# the Init phase rather than in the first send. The call runs in a daemon thread that init only
+# waits on for SQS_PRIMING_TIMEOUT seconds: with the retries and default timeouts above, an
+# unreachable endpoint could otherwise exceed Lambda's 10-second init limit.
+priming_thread = threading.Thread(target=_prime_sqs_client, daemon=True)
+priming_thread.start()
+priming_thread.join(timeout=SQS_PRIMING_TIMEOUT)
+
+# ==================================================================================================
+# Helper Functions
+# ==================================================================================================
+def _build_entries(batch):
+    """
+    Builds the SQS send_message_batch entries for one batch of serialized tenders.
+
+    Args:
+        batch (list): (deduplication ID, message body) pairs for the tenders in the batch.
+
+    Returns:
+        list: The entries for send_message_batch.
+    """
+    return [
+        {
+            'Id': SQS_ENTRY_IDS[i],
+            'MessageBody': message_body,
+            'MessageGroupId': SQS_MESSAGE_GROUP_ID,
+            'MessageDeduplicationId': deduplication_id
+        }
+        for i, (deduplication_id, message_body) in enumerate(batch)
+    ]
+
+def _collect_send_result(future, message_count):
+    """
+    Logs the outcome of a completed send_message_batch call.
+
+    Args:
+        future (Future): The completed send.
+        message_count (int): The number of messages in the batch.
+
+    Returns:
+        int: The number of messages SQS accepted.
+    """
+    try:
+        sqs_response = future.result()
+    except Exception as e:
+        logger.error(f"Failed to send a message batch to SQS: {e}")
+        return 0
+    logger.info(f"Successfully sent a batch of {message_count} messages to SQS.")
+    # Log if any messages within the batch failed.
+    if 'Failed' in sqs_response and sqs_response['Failed']:
+        logger.error(f"Failed to send some messages in a batch: {sqs_response['Failed']}")
+    return len(sqs_response.get('Successful', []))
+
+def _wait_for_send_capacity(pending):
+    """
+    Blocks until fewer than SQS_MAX_PENDING_BATCHES sends are in flight.
+
+    Completed sends are removed from `pending` and their results are logged.
+
+    Args:
+        pending (dict): Maps each in-flight send to the number of messages in its batch.
+
+    Returns:
+        int: The number of messages SQS accepted in the sends collected here.
+    """
+    sent_count = 0
+    while len(pending) >= SQS_MAX_PENDING_BATCHES:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            sent_count += _collect_send_result(future, pending.pop(future))
+    return sent_count
+
+def _deduplication_id(tender_id):
+    """
+    Builds the SQS FIFO MessageDeduplicationId for a tender.
+
+    Deduplication applies across the whole FIFO queue, which is shared with other lambdas, so
+    the ID is prefixed with SQS_DEDUPLICATION_ID_PREFIX to keep it from colliding with another
+    source's IDs. SQS only accepts up to 128 printable ASCII characters without spaces, so the
+    tender's ID is used as-is when it fits and is replaced by its SHA-256 hex digest otherwise.
+
+    Args:
+        tender_id: The tender's unique identifier (the API's rowKey).
+
+    Returns:
+        str: A valid MessageDeduplicationId.
+    """
+    deduplication_id = f"{SQS_DEDUPLICATION_ID_PREFIX}{tender_id}"
+    if (len(deduplication_id) <= 128 and deduplication_id.isascii() and deduplication_id.isprintable()
+            and ' ' not in deduplication_id):
+        return deduplication_id
+    return SQS_DEDUPLICATION_ID_PREFIX + hashlib.sha256(str(tender_id).encode('utf-8')).hexdigest()
 
 # ==================================================================================================
 # Lambda Function Handler
@@ -56,101 +203,110 @@ def lambda_handler(event, context):
     """
     logger.info("Starting Transnet tenders processing job.")
 
-    # --- Step 1: Fetch Data from the Transnet API ---
+    # --- Step 1: Connect to the Transnet API ---
+    response = None
     try:
         logger.info(f"Fetching data from {TRANSNET_API_URL}")
-        # Make a GET request to the API with a 30-second timeout.
-        response = requests.get(TRANSNET_API_URL, headers=HEADERS, timeout=30)
+        # Make a streaming GET request to the API with a 30-second timeout using the shared session.
+        # The call returns once the headers arrive; the body is read incrementally in Step 2.
+        response = http_session.get(TRANSNET_API_URL, stream=True, timeout=30)
         # Raise an exception for bad status codes (4xx or 5xx).
         response.raise_for_status()
-        api_response_dict = response.json()
-        
-        # The Transnet API response is a dictionary where the actual list of tenders
-        # is stored under the 'result' key. We safely get this list, defaulting to an
-        # empty list if the key is not found.
-        api_data = api_response_dict.get('result', [])
-        logger.info(f"Successfully fetched {len(api_data)} tender items from the API.")
-        
     except requests.exceptions.RequestException as e:
         # Handle network-related errors.
         logger.error(f"Failed to fetch data from API: {e}")
+        if response is not None:
+            # The body of a streamed response is never read here, so close it explicitly to
+            # release the connection back to the session's pool.
+            response.close()
         return {'statusCode': 502, 'body': json.dumps({'error': 'Failed to fetch data from source API'})}
-    except json.JSONDecodeError:
-        # Handle cases where the response is not valid JSON.
-        logger.error(f"Failed to decode JSON from API response. Response text: {response.text}")
-        return {'statusCode': 502, 'body': json.dumps({'error': 'Invalid JSON response from source API'})}
 
-    # --- Step 2: Process and Validate Each Tender Item ---
-    processed_tenders = []
+    # --- Step 2: Stream, Process, Batch and Send Each Tender Item ---
+    # The download, parsing and SQS sends are pipelined: this thread parses tenders off the
+    # socket and hands each full batch to the executor, whose worker threads send it to SQS
+    # while later tenders are still being downloaded. Sends run in parallel; botocore clients
+    # are thread-safe for this call. Ordering within a batch is preserved, but ordering across
+    # batches is not guaranteed, which is acceptable for a scrape job.
+    fetched_count = 0
+    processed_count = 0
     skipped_count = 0
+    sent_count = 0
+    # The error response to return if the stream fails part-way through.
+    error_response = None
 
-    for item in api_data:
+    with ThreadPoolExecutor(max_workers=SQS_MAX_WORKERS) as executor:
+        # Maps each pending send to the number of messages in its batch.
+        pending = {}
+        # A (deduplication ID, serialized message body) pair for each tender in the current batch.
+        batch = []
         try:
-            # Pass the tender dictionary directly to the model's factory method for processing.
-            tender_object = TransnetTender.from_api_response(item)
-            
-            # The from_api_response method returns None if the item is invalid (e.g., no ID).
-            if tender_object:
-                processed_tenders.append(tender_object)
-            else:
-                # If the object is None, it means it was intentionally skipped by the model.
-                skipped_count += 1
-
-        except (KeyError, ValueError, TypeError) as e:
-            # Catch any other unexpected errors during parsing.
-            skipped_count += 1
-            tender_id = item.get('rowKey', 'Unknown')
-            logger.warning(f"Skipping tender {tender_id} due to a validation/parsing error: {e}.")
-            continue
-
-    logger.info(f"Successfully processed {len(processed_tenders)} tenders.")
-    if skipped_count > 0:
-        logger.warning(f"Skipped a total of {skipped_count} tenders due to errors.")
-
-    # --- Step 3: Prepare Data for SQS ---
-    # Convert the list of TransnetTender objects into a list of dictionaries.
-    processed_tender_dicts = [tender.to_dict() for tender in processed_tenders]
-
-    # --- Step 4: Batch and Send Messages to SQS ---
-    batch_size = 10
-    # Split the list of tenders into smaller batches.
-    message_batches = [
-        processed_tender_dicts[i:i + batch_size]
-        for i in range(0, len(processed_tender_dicts), batch_size)
-    ]
+            # Let urllib3 undo any gzip/deflate content encoding while the raw body is streamed.
+            response.raw.decode_content = True
+            # The Transnet API response is a dictionary where the actual list of tenders is stored
+            # under the 'result' key. ijson yields the tenders in that list one at a time as they
+            # are read off the socket, so the full payload is never held in memory. If the key is
+            # not found, no items are yielded.
+            for item in ijson.items(response.raw, 'result.item', use_float=True):
+                fetched_count += 1
+                # Clean the tender straight into the dictionary sent to SQS, skipping the
+                # intermediate TransnetTender object. Invalid dates are handled by the model,
+                # which logs them and leaves the date empty.
+                tender_dict = TransnetTender.to_sqs_dict(item)
 
-    sent_count = 0
-    for batch_index, batch in enumerate(message_batches):
-        entries = []
-        for i, tender_dict in enumerate(batch):
-            entries.append({
-                'Id': f'tender_message_{batch_index}_{i}',
-                'MessageBody': json.dumps(tender_dict),
-                # Use a specific MessageGroupId for Transnet to maintain order for this source.
-                'MessageGroupId': 'TransnetTenderScrape'
-            })
-
-        # Skip sending if the batch is empty for any reason.
-        if not entries:
-            continue
+                # The to_sqs_dict method returns None if the item is invalid (e.g., no ID).
+                if not tender_dict:
+                    # If the result is None, it means it was intentionally skipped by the model.
+                    skipped_count += 1
+                    continue
 
-        try:
-            # Send the batch of messages to the SQS queue.
-            response = sqs_client.send_message_batch(
-                QueueUrl=SQS_QUEUE_URL,
-                Entries=entries
-            )
-            sent_count += len(response.get('Successful', []))
-            logger.info(f"Successfully sent a batch of {len(entries)} messages to SQS.")
-            # Log if any messages within the batch failed.
-            if 'Failed' in response and response['Failed']:
-                logger.error(f"Failed to send some messages in a batch: {response['Failed']}")
-        except Exception as e:
-            logger.error(f"Failed to send a message batch to SQS: {e}")
+                processed_count += 1
+                # orjson returns UTF-8 bytes; SQS expects the message body as a string.
+                # The tender's rowKey is the basis of the FIFO deduplication ID, so SQS does not need to
+                # hash the body and re-sending an unchanged tender within the deduplication window is a no-op.
+                batch.append((_deduplication_id(item['rowKey']), orjson.dumps(tender_dict).decode('utf-8')))
+
+                # Dispatch each batch as soon as it is full. Once SQS_MAX_PENDING_BATCHES sends are
+                # in flight, wait for one to finish first, so a slow or throttled SQS pauses the
+                # download instead of letting serialized batches pile up in memory.
+                if len(batch) == SQS_BATCH_SIZE:
+                    sent_count += _wait_for_send_capacity(pending)
+                    entries = _build_entries(batch)
+                    pending[executor.submit(sqs_client.send_message_batch, QueueUrl=SQS_QUEUE_URL, Entries=entries)] = len(entries)
+                    batch = []
+
+            # Dispatch the final, partially filled batch.
+            if batch:
+                sent_count += _wait_for_send_capacity(pending)
+                entries = _build_entries(batch)
+                pending[executor.submit(sqs_client.send_message_batch, QueueUrl=SQS_QUEUE_URL, Entries=entries)] = len(entries)
+
+        except urllib3.exceptions.HTTPError as e:
+            # Handle network-related errors while the body is being streamed.
+            logger.error(f"Failed to fetch data from API: {e}")
+            error_response = {'statusCode': 502, 'body': json.dumps({'error': 'Failed to fetch data from source API'})}
+        except ijson.JSONError as e:
+            # Handle cases where the response is not valid JSON.
+            logger.error(f"Failed to decode JSON from API response: {e}")
+            error_response = {'statusCode': 502, 'body': json.dumps({'error': 'Invalid JSON response from source API'})}
+        finally:
+            response.close()
+
+        logger.info(f"Successfully fetched {fetched_count} tender items from the API.")
+        logger.info(f"Successfully processed {processed_count} tenders.")
+        if skipped_count > 0:
+            logger.warning(f"Skipped a total of {skipped_count} tenders due to errors.")
+
+        # --- Step 3: Collect the Results of the Remaining SQS Sends ---
+        # Batches dispatched before a stream failure are still awaited and reported.
+        for future in as_completed(pending):
+            sent_count += _collect_send_result(future, pending[future])
 
     logger.info(f"Processing complete. Sent a total of {sent_count} messages to SQS.")
 
-    # --- Step 5: Return a Success Response ---
+    if error_response:
+        return error_response
+
+    # --- Step 4: Return a Success Response ---
     return {
         'statusCode': 200,
         'body': json.dumps({'message': 'Tender data processed and sent to SQS queue.'})
@@ -13,7 +13,8 @@
 #     for any tender. This promotes consistency across different tender types.
 #   - TransnetTender: A concrete class that inherits from TenderBase and adds fields
 #     specific to the data provided by the Transnet API. It includes logic for parsing
-#     the raw API response into a clean, usable object.
+#     the raw API response into a clean, usable object, or directly into the dictionary
+#     sent to SQS.
 #
 # ==================================================================================================
 
@@ -21,9 +22,110 @@
 # abc (Abstract Base Classes) is used to define the basic structure of a tender.
 # datetime is used for handling and formatting date/time information.
 # logging is used to record warnings or errors during data parsing.
+# functools and sys are used to cache and intern frequently repeated field values.
 from abc import ABC, abstractmethod
 from datetime import datetime
+from functools import lru_cache
 import logging
+import sys
+
+# --- Text Cleaning Helpers ---
+# Translation table used to clean free-text fields from the API in a single pass:
+# newlines are replaced with spaces and carriage returns are removed.
+_CLEAN_TABLE = str.maketrans({'\n': ' ', '\r': None})
+
+def _clean(value: str, caser) -> str:
+    """
+    Cleans a raw text field and standardizes its case.
+
+    Args:
+        value (str): The raw string from the API. May be empty or None.
+        caser (callable): The case function to apply, e.g. str.title, str.upper or str.lower.
+
+    Returns:
+        str: The cleaned string, or an empty string if no value was provided.
+    """
+    return caser(value.translate(_CLEAN_TABLE).strip()) if value else ''
+
+@lru_cache(maxsize=256)
+def _clean_interned(value: str, caser) -> str:
+    """
+    Cleans a raw text field like _clean(), sharing one interned string per distinct value.
+
+    Intended for low-cardinality fields such as the tender type or location, where most
+    tenders repeat a handful of values. Results are cached per (value, caser), so repeats
+    skip the cleaning work entirely and reuse the same string object instead of allocating
+    a new one per tender. The cache is bounded, as it survives warm invocations.
+
+    Args:
+        value (str): The raw string from the API. May be empty or None.
+        caser (callable): The case function to apply, e.g. str.title, str.upper or str.lower.
+
+    Returns:
+        str: The cleaned string, or an empty string if no value was provided.
+    """
+    return sys.intern(_clean(value, caser)) if value else ''
+
+# The free-text fields of a Transnet API item, as (API key, output key, attribute name,
+# case function, cleaner). These tables are the single definition of how each text field is
+# cleaned, used both for the model attributes and for the dictionary sent to SQS.
+# The output keys and their order match those produced by TransnetTender.to_dict(): the base
+# text fields come first, followed by the other base fields, then the Transnet-specific fields.
+_BASE_TEXT_FIELDS = (
+    ('nameOfTender', 'title', 'title', str.title, _clean),
+    ('descriptionOfTender', 'description', 'description', str.title, _clean),
+)
+_TRANSNET_TEXT_FIELDS = (
+    ('tenderNumber', 'tenderNumber', 'tender_number', str.upper, _clean),
+    ('nameOfInstitution', 'institution', 'institution', str.upper, _clean_interned),
+    ('tenderCategory', 'category', 'category', str.title, _clean_interned),
+    ('tenderType', 'tenderType', 'tender_type', str.upper, _clean_interned),
+    ('locationOfService', 'location', 'location', str.title, _clean_interned),
+    ('contactPersonEmailAddress', 'email', 'email', str.lower, _clean),
+    ('contactPersonName', 'contactPerson', 'contact_person', str.title, _clean),
+)
+
+# --- Date Parsing Helpers ---
+# The Transnet API uses a specific date format (Month/Day/Year Hour:Minute:Second AM/PM).
+_DATE_FORMAT = '%m/%d/%Y %I:%M:%S %p'
+
+def _parse_transnet_date(value: str) -> datetime:
+    """
+    Parses a date string from the Transnet API, e.g. "10/31/2025 04:00:00 PM".
+
+    The common fixed-width form is sliced directly into integers, which avoids the
+    format and locale handling done by datetime.strptime on every call. Anything else
+    (e.g. unpadded months or days) falls back to datetime.strptime.
+
+    Args:
+        value (str): The raw date string from the API.
+
+    Returns:
+        datetime: The parsed date and time.
+
+    Raises:
+        ValueError: If the string does not match the expected format.
+        TypeError: If the value is not a string.
+    """
+    # The fast path is only taken when every field is exactly two or four ASCII digits, so it
+    # never accepts anything (spaces, signs, underscores, non-ASCII digits) that strptime rejects.
+    if (len(value) == 22 and value.isascii() and value[2] == '/' and value[5] == '/' and value[10] == ' '
+            and value[13] == ':' and value[16] == ':' and value[19] == ' ' and value[20:] in ('AM', 'PM')
+            and value[0:2].isdigit() and value[3:5].isdigit() and value[6:10].isdigit()
+            and value[11:13].isdigit() and value[14:16].isdigit() and value[17:19].isdigit()):
+        hour = int(value[11:13])
+        if 1 <= hour <= 12:
+            # Convert the 12-hour clock to a 24-hour clock (12 AM is midnight, 12 PM is noon).
+            hour %= 12
+            if value[20] == 'P':
+                hour += 12
+            try:
+                return datetime(int(value[6:10]), int(value[0:2]), int(value[3:5]),
+                                hour, int(value[14:16]), int(value[17:19]))
+            except ValueError:
+                # Out-of-range values (e.g. month 13) are reported by strptime below.
+                pass
+    return datetime.strptime(value, _DATE_FORMAT)
 
 # ==================================================================================================
 # Class: SupportingDoc
@@ -33,6 +135,9 @@ class SupportingDoc:
     """
     A simple data class to hold information about a supporting document.
     """
+    # Declaring slots avoids a per-instance __dict__, reducing memory use per document.
+    __slots__ = ('name', 'url')
+
     def __init__(self, name: str, url: str):
         """
         Initializes a new instance of the SupportingDoc class.
@@ -62,6 +167,10 @@ class TenderBase(ABC):
     """
     An abstract base class that serves as a template for all specific tender models.
     """
+    # Declaring slots avoids a per-instance __dict__, reducing memory use per tender.
+    # Subclasses must declare their own __slots__ for any additional attributes.
+    __slots__ = ('title', 'description', 'source', 'published_date', 'closing_date', 'supporting_docs', 'tags')
+
     def __init__(self, title: str, description: str, source: str, published_date: datetime, closing_date: datetime, supporting_docs: list = None, tags: list = None):
         """
         Initializes the base attributes of a tender.
@@ -106,9 +215,8 @@ class TenderBase(ABC):
             "publishedDate": self.published_date.isoformat() if self.published_date else None,
             "closingDate": self.closing_date.isoformat() if self.closing_date else None,
             "supporting_docs": [doc.to_dict() for doc in self.supporting_docs],
-            # In the base model, this assumes tags are objects with a to_dict method.
-            # For this project, tags are simple strings, so this will be overridden or adjusted.
-            "tags": [tag.to_dict() for tag in self.tags]
+            # Tags are simple strings, so they are copied as-is.
+            "tags": list(self.tags)
         }
 
 # ==================================================================================================
@@ -119,6 +227,9 @@ class TransnetTender(TenderBase):
     """
     Represents a tender sourced from Transnet. It adds fields unique to the Transnet API.
     """
+    # Slots for the Transnet-specific attributes; the base fields are declared in TenderBase.
+    __slots__ = ('tender_number', 'institution', 'category', 'tender_type', 'location', 'email', 'contact_person')
+
     def __init__(
         self,
         # --- Base fields required by TenderBase ---
@@ -146,12 +257,39 @@ class TransnetTender(TenderBase):
         self.email = email
         self.contact_person = contact_person
 
+    @staticmethod
+    def _parse_date_field(response_item: dict, key: str, tender_id: str):
+        """
+        Parses one of the date fields of a raw API response item.
+
+        Args:
+            response_item (dict): A dictionary containing a single tender's data from the Transnet API.
+            key (str): The name of the date field, e.g. 'publishedDate'.
+            tender_id (str): The tender's unique identifier, used for logging.
+
+        Returns:
+            datetime or None: The parsed date, or None if it is missing or invalid.
+        """
+        date_str = response_item.get(key)
+        if not date_str:
+            return None
+        try:
+            # Convert the string to a datetime object.
+            return _parse_transnet_date(date_str)
+        except (TypeError, ValueError):
+            # Log a warning if the date is in an incorrect format.
+            logging.warning(f"Tender {tender_id} has invalid {key}: {date_str}")
+            return None
+
     @classmethod
     def from_api_response(cls, response_item: dict):
         """
         Factory method to create a TransnetTender object from a raw API response.
         This method handles data extraction, cleaning, and validation.
 
+        The Lambda handler uses to_sqs_dict() instead, which produces the serialized
+        form directly; this method is kept for callers that need the model object.
+
         Args:
             response_item (dict): A dictionary containing a single tender's data from the Transnet API.
 
@@ -171,46 +309,58 @@ class TransnetTender(TenderBase):
             # If an attachment URL exists, create a SupportingDoc object for it.
             doc_list.append(SupportingDoc(name="Tender Attachment", url=attachment_url))
 
-        # --- Date Parsing ---
-        # The Transnet API uses a specific date format (Month/Day/Year Hour:Minute:Second AM/PM).
-        date_format = '%m/%d/%Y %I:%M:%S %p'
-        pub_date, close_date = None, None
-        try:
-            pub_date_str = response_item.get('publishedDate')
-            if pub_date_str:
-                # Convert the string to a datetime object using the specified format.
-                pub_date = datetime.strptime(pub_date_str, date_format)
-        except (TypeError, ValueError):
-            # Log a warning if the date is missing or in an incorrect format.
-            logging.warning(f"Tender {tender_id} has invalid publishedDate: {response_item.get('publishedDate')}")
-        try:
-            close_date_str = response_item.get('closingDate')
-            if close_date_str:
-                close_date = datetime.strptime(close_date_str, date_format)
-        except (TypeError, ValueError):
-            logging.warning(f"Tender {tender_id} has invalid closingDate: {response_item.get('closingDate')}")
-
         # --- Object Creation and Data Cleaning ---
         # Create and return an instance of the class, cleaning up string fields.
-        # .strip() removes leading/trailing whitespace.
-        # .title(), .upper(), .lower() standardize the case of the text.
+        # The text fields are cleaned according to the _BASE_TEXT_FIELDS and _TRANSNET_TEXT_FIELDS
+        # tables: line breaks and surrounding whitespace are removed, then the case is standardized.
+        text_fields = {
+            attribute: clean(response_item.get(api_key), caser)
+            for api_key, _, attribute, caser, clean in _BASE_TEXT_FIELDS + _TRANSNET_TEXT_FIELDS
+        }
         return cls(
-            title=response_item.get('nameOfTender', '').replace('\n', ' ').replace('\r', '').strip().title(),
-            description=response_item.get('descriptionOfTender', '').replace('\n', ' ').replace('\r', '').strip().title(),
             source="Transnet", # Hardcoded source.
-            published_date=pub_date,
-            closing_date=close_date,
+            published_date=cls._parse_date_field(response_item, 'publishedDate', tender_id),
+            closing_date=cls._parse_date_field(response_item, 'closingDate', tender_id),
             supporting_docs=doc_list,
             tags=[], # Initialize with an empty list for the AI service.
-            tender_number=response_item.get('tenderNumber', '').replace('\n', ' ').replace('\r', '').strip().upper(),
-            institution=response_item.get('nameOfInstitution', '').replace('\n', ' ').replace('\r', '').strip().upper(),
-            category=response_item.get('tenderCategory', '').replace('\n', ' ').replace('\r', '').strip().title(),
-            tender_type=response_item.get('tenderType', '').replace('\n', ' ').replace('\r', '').strip().upper(),
-            location=response_item.get('locationOfService', '').replace('\n', ' ').replace('\r', '').strip().title(),
-            email=response_item.get('contactPersonEmailAddress', '').replace('\n', ' ').replace('\r', '').strip().lower(),
-            contact_person=response_item.get('contactPersonName', '').replace('\n', ' ').replace('\r', '').strip().title()
+            **text_fields
         )
 
+    @classmethod
+    def to_sqs_dict(cls, response_item: dict):
+        """
+        Cleans a raw API response item straight into its serialized dictionary form.
+
+        This is the production path used by the Lambda handler. It produces the same
+        output as from_api_response(response_item).as_orjson_payload() without creating
+        the intermediate TransnetTender and SupportingDoc objects.
+
+        Args:
+            response_item (dict): A dictionary containing a single tender's data from the Transnet API.
+
+        Returns:
+            dict or None: The dictionary representation of the tender, or None if validation fails.
+        """
+        # If there is no ID, the item is invalid, so we return None to skip it.
+        tender_id = response_item.get('rowKey')
+        if not tender_id:
+            return None
+
+        attachment_url = response_item.get('attachment')
+
+        # The keys, their order and the cleaning rules match to_dict() and from_api_response().
+        # The text fields are cleaned in loops over the _BASE_TEXT_FIELDS and _TRANSNET_TEXT_FIELDS tables.
+        data = {key: clean(response_item.get(api_key), caser) for api_key, key, _, caser, clean in _BASE_TEXT_FIELDS}
+        data["source"] = "Transnet"
+        # Dates are left as datetime objects for orjson to serialize (see as_orjson_payload).
+        data["publishedDate"] = cls._parse_date_field(response_item, 'publishedDate', tender_id)
+        data["closingDate"] = cls._parse_date_field(response_item, 'closingDate', tender_id)
+        data["supporting_docs"] = [{"name": "Tender Attachment", "url": attachment_url}] if attachment_url else []
+        data["tags"] = []
+        for api_key, key, _, caser, clean in _TRANSNET_TEXT_FIELDS:
+            data[key] = clean(response_item.get(api_key), caser)
+        return data
+
     def to_dict(self):
         """
         Serializes the TransnetTender object to a dictionary.
@@ -230,4 +380,33 @@ class TransnetTender(TenderBase):
             "email": self.email,
             "contactPerson": self.contact_person
         })
-        return data
\ No newline at end of file
+        return data
+
+    def as_orjson_payload(self):
+        """
+        Builds the dictionary form of the tender for serialization with orjson.
+
+        Unlike to_dict(), the dates are kept as datetime objects and the supporting
+        documents are inlined, leaving the conversion to orjson. orjson writes naive
+        datetimes in the same ISO 8601 form as datetime.isoformat(), so the serialized
+        JSON is identical to that of to_dict().
+
+        Returns:
+            dict: A complete dictionary representation of the Transnet tender.
+        """
+        return {
+            "title": self.title,
+            "description": self.description,
+            "source": self.source,
+            "publishedDate": self.published_date,
+            "closingDate": self.closing_date,
+            "supporting_docs": [{"name": doc.name, "url": doc.url} for doc in self.supporting_docs],
+            "tags": list(self.tags),
+            "tenderNumber": self.tender_number,
+            "institution": self.institution,
+            "category": self.category,
+            "tenderType": self.tender_type,
+            "location": self.location,
+            "email": self.email,
+            "contactPerson": self.contact_person
+        }
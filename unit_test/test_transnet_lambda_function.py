@@ -1,102 +1,243 @@
 import unittest
 import json
 from unittest.mock import patch, Mock
+import io
 import sys
 import os
+import threading
+import time
 
-# Patch boto3 before importing lambda_function
-mock_boto3 = Mock()
-mock_boto3.client.return_value = Mock()
-sys.modules['boto3'] = mock_boto3
+# Patch botocore before importing lambda_function
+mock_botocore = Mock()
+mock_botocore.session.Session.return_value.create_client.return_value = Mock()
+sys.modules['botocore'] = mock_botocore
+sys.modules['botocore.session'] = mock_botocore.session
+sys.modules['botocore.config'] = mock_botocore.config
 
 import lambda_function
 
 class TestTransnetLambdaFunction(unittest.TestCase):
 
-    @patch('lambda_function.requests.get')
+    @patch('lambda_function.http_session.get')
     @patch('lambda_function.sqs_client.send_message_batch')
-    @patch('lambda_function.TransnetTender.from_api_response')
-    def test_lambda_handler_success(self, mock_from_api, mock_sqs, mock_get):
+    @patch('lambda_function.TransnetTender.to_sqs_dict')
+    def test_lambda_handler_success(self, mock_to_sqs_dict, mock_sqs, mock_get):
         with open(os.path.join('unit_test', 'test_data', 'sample_transnet.json'), 'r') as f:
             sample_data = json.load(f)
 
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.raise_for_status = Mock()
-        mock_response.json = lambda: {"result": sample_data}
+        mock_response.raw = io.BytesIO(json.dumps({"result": sample_data}).encode('utf-8'))
         mock_get.return_value = mock_response
 
-        mock_tender = Mock()
-        mock_tender.to_dict.return_value = {"title": "Valid Tender"}
-        mock_from_api.return_value = mock_tender
+        tender_dict = {"title": "Valid Tender"}
+        mock_to_sqs_dict.return_value = tender_dict
 
-        mock_sqs.return_value = {"Successful": [{"Id": "tender_message_0_0"}]}
+        mock_sqs.return_value = {"Successful": [{"Id": "0"}]}
 
         result = lambda_function.lambda_handler({}, {})
         self.assertEqual(result['statusCode'], 200)
         self.assertIn("Tender data processed", result['body'])
 
-    @patch('lambda_function.requests.get')
+    @patch('lambda_function.http_session.get')
     def test_lambda_handler_fetch_fail(self, mock_get):
         mock_get.side_effect = lambda_function.requests.exceptions.RequestException("Network error")
         result = lambda_function.lambda_handler({}, {})
         self.assertEqual(result['statusCode'], 502)
         self.assertIn("Failed to fetch data from source API", result['body'])
 
-    @patch('lambda_function.requests.get')
+    @patch('lambda_function.http_session.get')
+    def test_lambda_handler_bad_status_closes_response(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 503
+        mock_response.raise_for_status.side_effect = lambda_function.requests.exceptions.HTTPError("503 Server Error")
+        mock_get.return_value = mock_response
+
+        result = lambda_function.lambda_handler({}, {})
+        self.assertEqual(result['statusCode'], 502)
+        self.assertIn("Failed to fetch data from source API", result['body'])
+        mock_response.close.assert_called_once()
+
+    @patch('lambda_function.http_session.get')
     def test_lambda_handler_invalid_json(self, mock_get):
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.raise_for_status = Mock()
-        mock_response.json.side_effect = json.JSONDecodeError("Expecting value", "", 0)
+        mock_response.raw = io.BytesIO(b"<html>Service Unavailable</html>")
         mock_get.return_value = mock_response
 
         result = lambda_function.lambda_handler({}, {})
         self.assertEqual(result['statusCode'], 502)
         self.assertIn("Invalid JSON response", result['body'])
 
-    @patch('lambda_function.requests.get')
+    @patch('lambda_function.http_session.get')
     @patch('lambda_function.sqs_client.send_message_batch')
-    @patch('lambda_function.TransnetTender.from_api_response')
-    def test_lambda_handler_with_malformed_tender(self, mock_from_api, mock_sqs, mock_get):
+    @patch('lambda_function.TransnetTender.to_sqs_dict')
+    def test_lambda_handler_with_malformed_tender(self, mock_to_sqs_dict, mock_sqs, mock_get):
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.raise_for_status = Mock()
-        mock_response.json = lambda: {"result": [None, {"rowKey": "123"}]}
+        mock_response.raw = io.BytesIO(b'{"result": [null, {"rowKey": "123"}]}')
         mock_get.return_value = mock_response
 
-        mock_tender = Mock()
-        mock_tender.to_dict.return_value = {"title": "Valid Tender"}
-        mock_from_api.side_effect = lambda item: None if item is None else mock_tender
+        tender_dict = {"title": "Valid Tender"}
+        mock_to_sqs_dict.side_effect = lambda item: None if item is None else tender_dict
 
-        mock_sqs.return_value = {"Successful": [{"Id": "tender_message_0_0"}]}
+        mock_sqs.return_value = {"Successful": [{"Id": "0"}]}
 
         result = lambda_function.lambda_handler({}, {})
         self.assertEqual(result['statusCode'], 200)
         self.assertIn("Tender data processed", result['body'])
 
-    @patch('lambda_function.requests.get')
+    @patch('lambda_function.http_session.get')
     @patch('lambda_function.sqs_client.send_message_batch')
-    @patch('lambda_function.TransnetTender.from_api_response')
-    def test_lambda_handler_with_sqs_failure(self, mock_from_api, mock_sqs, mock_get):
+    @patch('lambda_function.TransnetTender.to_sqs_dict')
+    def test_lambda_handler_with_sqs_failure(self, mock_to_sqs_dict, mock_sqs, mock_get):
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.raise_for_status = Mock()
-        mock_response.json = lambda: {"result": [{"rowKey": "123"}]}
+        mock_response.raw = io.BytesIO(b'{"result": [{"rowKey": "123"}]}')
         mock_get.return_value = mock_response
 
-        mock_tender = Mock()
-        mock_tender.to_dict.return_value = {"title": "Valid Tender"}
-        mock_from_api.return_value = mock_tender
+        tender_dict = {"title": "Valid Tender"}
+        mock_to_sqs_dict.return_value = tender_dict
 
         mock_sqs.return_value = {
             "Successful": [],
-            "Failed": [{"Id": "tender_message_0_0", "Message": "AccessDenied"}]
+            "Failed": [{"Id": "0", "Message": "AccessDenied"}]
         }
 
         result = lambda_function.lambda_handler({}, {})
         self.assertEqual(result['statusCode'], 200)
         self.assertIn("Tender data processed", result['body'])
 
+    @patch('lambda_function.http_session.get')
+    @patch('lambda_function.sqs_client.send_message_batch')
+    @patch('lambda_function.TransnetTender.to_sqs_dict')
+    def test_lambda_handler_sends_all_batches(self, mock_to_sqs_dict, mock_sqs, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        mock_response.raw = io.BytesIO(json.dumps({"result": [{"rowKey": str(i)} for i in range(25)]}).encode('utf-8'))
+        mock_get.return_value = mock_response
+
+        tender_dict = {"title": "Valid Tender"}
+        mock_to_sqs_dict.return_value = tender_dict
+
+        mock_sqs.side_effect = lambda QueueUrl, Entries: {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+        result = lambda_function.lambda_handler({}, {})
+        self.assertEqual(result['statusCode'], 200)
+        self.assertEqual(mock_sqs.call_count, 3)
+        batch_ids = sorted([e["Id"] for e in call.kwargs["Entries"]] for call in mock_sqs.call_args_list)
+        # Entry IDs are unique within each batch and reused across batches.
+        self.assertEqual(batch_ids, [[str(i) for i in range(5)]] + [[str(i) for i in range(10)]] * 2)
+        dedup_ids = {e["MessageDeduplicationId"] for call in mock_sqs.call_args_list for e in call.kwargs["Entries"]}
+        self.assertEqual(dedup_ids, {f"transnet-{i}" for i in range(25)})
+
+    @patch('lambda_function.http_session.get')
+    @patch('lambda_function.sqs_client.send_message_batch')
+    def test_lambda_handler_streams_response_body(self, mock_sqs, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        mock_response.raw = io.BytesIO('{"result": [{"rowKey": "abc123", "nameOfTender": "Upgrade of Rail – Phase 2"}]}'.encode('utf-8'))
+        # The body must be parsed incrementally from the raw stream, not loaded in full.
+        mock_response.json.side_effect = AssertionError("response.json() should not be used")
+        mock_get.return_value = mock_response
+
+        mock_sqs.return_value = {"Successful": [{"Id": "0"}]}
+
+        result = lambda_function.lambda_handler({}, {})
+        self.assertEqual(result['statusCode'], 200)
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+        self.assertTrue(mock_response.raw.decode_content)
+        mock_response.close.assert_called_once()
+        body = json.loads(mock_sqs.call_args.kwargs["Entries"][0]["MessageBody"])
+        self.assertEqual(body["title"], "Upgrade Of Rail – Phase 2")
+
+    @patch('lambda_function.http_session.get')
+    @patch('lambda_function.sqs_client.send_message_batch')
+    def test_lambda_handler_stream_interrupted(self, mock_sqs, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        mock_response.raw.read.side_effect = lambda_function.urllib3.exceptions.ProtocolError("Connection broken")
+        mock_get.return_value = mock_response
+
+        result = lambda_function.lambda_handler({}, {})
+        self.assertEqual(result['statusCode'], 502)
+        self.assertIn("Failed to fetch data from source API", result['body'])
+        mock_sqs.assert_not_called()
+
+    @patch('lambda_function.http_session.get')
+    @patch('lambda_function.sqs_client.send_message_batch')
+    @patch('lambda_function.TransnetTender.to_sqs_dict')
+    def test_lambda_handler_sends_batches_before_stream_error(self, mock_to_sqs_dict, mock_sqs, mock_get):
+        items = ", ".join(json.dumps({"rowKey": str(i)}) for i in range(12))
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        # The body is cut off part-way through the thirteenth tender.
+        mock_response.raw = io.BytesIO(('{"result": [' + items + ', {"rowKey": ').encode('utf-8'))
+        mock_get.return_value = mock_response
+
+        mock_to_sqs_dict.return_value = {"title": "Valid Tender"}
+        mock_sqs.side_effect = lambda QueueUrl, Entries: {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+        result = lambda_function.lambda_handler({}, {})
+        self.assertEqual(result['statusCode'], 502)
+        self.assertIn("Invalid JSON response", result['body'])
+        # The first full batch was dispatched while the body was still being parsed.
+        self.assertEqual(mock_sqs.call_count, 1)
+        self.assertEqual(len(mock_sqs.call_args.kwargs["Entries"]), 10)
+
+    @patch('lambda_function.SQS_MAX_PENDING_BATCHES', 2)
+    @patch('lambda_function.SQS_MAX_WORKERS', 1)
+    @patch('lambda_function.http_session.get')
+    @patch('lambda_function.sqs_client.send_message_batch')
+    @patch('lambda_function.TransnetTender.to_sqs_dict')
+    def test_lambda_handler_caps_pending_batches(self, mock_to_sqs_dict, mock_sqs, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        mock_response.raw = io.BytesIO(json.dumps({"result": [{"rowKey": str(i)} for i in range(100)]}).encode('utf-8'))
+        mock_get.return_value = mock_response
+        mock_to_sqs_dict.return_value = {"title": "Valid Tender"}
+
+        lock = threading.Lock()
+        counts = {"submitted": 0, "completed": 0, "max_pending": 0}
+
+        def slow_send(QueueUrl, Entries):
+            time.sleep(0.01)
+            with lock:
+                counts["completed"] += 1
+            return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+        mock_sqs.side_effect = slow_send
+
+        build_entries = lambda_function._build_entries
+        def counting_build_entries(batch):
+            # Called right before each submit, so this is the number of sends still in flight.
+            with lock:
+                counts["max_pending"] = max(counts["max_pending"], counts["submitted"] - counts["completed"])
+                counts["submitted"] += 1
+            return build_entries(batch)
+
+        with patch('lambda_function._build_entries', side_effect=counting_build_entries):
+            result = lambda_function.lambda_handler({}, {})
+
+        self.assertEqual(result['statusCode'], 200)
+        self.assertEqual(mock_sqs.call_count, 10)
+        self.assertLess(counts["max_pending"], 2)
+
+    def test_deduplication_id(self):
+        self.assertEqual(lambda_function._deduplication_id("abc-123"), "transnet-abc-123")
+        self.assertEqual(lambda_function._deduplication_id(42), "transnet-42")
+        for invalid_id in ("has space", "x" * 200, "x" * 120):
+            deduplication_id = lambda_function._deduplication_id(invalid_id)
+            self.assertTrue(deduplication_id.startswith("transnet-"))
+            self.assertEqual(len(deduplication_id), len("transnet-") + 64)
+
 if __name__ == '__main__':
     unittest.main()
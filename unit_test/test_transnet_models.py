@@ -1,6 +1,7 @@
 import unittest
 from datetime import datetime
-from models import TransnetTender, SupportingDoc
+import orjson
+from models import TransnetTender, SupportingDoc, _clean_interned
 
 class TestTransnetModels(unittest.TestCase):
 
@@ -28,6 +29,60 @@ class TestTransnetModels(unittest.TestCase):
         self.assertEqual(tender.email, "contact@transnet.co.za")
         self.assertEqual(len(tender.supporting_docs), 1)
 
+    def test_from_api_response_cleans_text_fields(self):
+        sample = {
+            "rowKey": "abc123",
+            "nameOfTender": "  upgrade of\r\nrail  ",
+            "tenderNumber": "tn123\n",
+            "contactPersonEmailAddress": " Contact@Transnet.co.za ",
+            "locationOfService": None
+        }
+
+        tender = TransnetTender.from_api_response(sample)
+        self.assertEqual(tender.title, "Upgrade Of Rail")
+        self.assertEqual(tender.tender_number, "TN123")
+        self.assertEqual(tender.email, "contact@transnet.co.za")
+        self.assertEqual(tender.location, "")
+
+    def test_from_api_response_parses_dates(self):
+        sample = {
+            "rowKey": "abc123",
+            "publishedDate": "10/01/2025 12:05:00 AM",
+            "closingDate": "1/9/2025 12:30:15 PM"
+        }
+
+        tender = TransnetTender.from_api_response(sample)
+        self.assertEqual(tender.published_date, datetime(2025, 10, 1, 0, 5, 0))
+        self.assertEqual(tender.closing_date, datetime(2025, 1, 9, 12, 30, 15))
+
+    def test_from_api_response_invalid_date(self):
+        sample = {
+            "rowKey": "abc123",
+            "publishedDate": "13/45/2025 09:00:00 AM",
+            "closingDate": "not a date"
+        }
+
+        tender = TransnetTender.from_api_response(sample)
+        self.assertIsNone(tender.published_date)
+        self.assertIsNone(tender.closing_date)
+
+        for invalid_date in ("10/31/202  04:08:00 PM", "10/31/2_25 04:00:00 PM"):
+            tender = TransnetTender.from_api_response({"rowKey": "abc123", "publishedDate": invalid_date})
+            self.assertIsNone(tender.published_date)
+
+    def test_low_cardinality_fields_share_strings(self):
+        first = TransnetTender.to_sqs_dict({"rowKey": "1", "tenderType": "open ", "locationOfService": "durban"})
+        second = TransnetTender.to_sqs_dict({"rowKey": "2", "tenderType": "open ", "locationOfService": "durban"})
+        self.assertEqual(first["tenderType"], "OPEN")
+        self.assertEqual(first["location"], "Durban")
+        self.assertIs(first["tenderType"], second["tenderType"])
+        self.assertIs(first["location"], second["location"])
+
+    def test_interned_value_cache_is_bounded(self):
+        for i in range(1000):
+            _clean_interned(f"location {i}", str.title)
+        self.assertLessEqual(_clean_interned.cache_info().currsize, 256)
+
     def test_from_api_response_missing_id(self):
         sample = {
             "nameOfTender": "Upgrade of Rail"
@@ -35,6 +90,31 @@ class TestTransnetModels(unittest.TestCase):
         tender = TransnetTender.from_api_response(sample)
         self.assertIsNone(tender)
 
+    def test_to_sqs_dict_matches_to_dict(self):
+        sample = {
+            "rowKey": "abc123",
+            "nameOfTender": "Upgrade of Rail",
+            "descriptionOfTender": "Full overhaul of rail infrastructure",
+            "publishedDate": "10/01/2025 09:00:00 AM",
+            "closingDate": "10/31/2025 04:00:00 PM",
+            "attachment": "https://example.com/doc.pdf",
+            "tenderNumber": "TN123",
+            "nameOfInstitution": "Transnet Freight Rail",
+            "tenderCategory": "Infrastructure",
+            "tenderType": "Open",
+            "locationOfService": "Durban",
+            "contactPersonEmailAddress": "contact@transnet.co.za",
+            "contactPersonName": "John Doe"
+        }
+
+        data = TransnetTender.to_sqs_dict(sample)
+        tender = TransnetTender.from_api_response(sample)
+        self.assertEqual(data, tender.as_orjson_payload())
+        # Compare the serialized bytes so the key order of the SQS message body is checked too.
+        self.assertEqual(orjson.dumps(data), orjson.dumps(tender.to_dict()))
+        self.assertEqual(orjson.dumps(data), orjson.dumps(tender.as_orjson_payload()))
+        self.assertIsNone(TransnetTender.to_sqs_dict({"nameOfTender": "Upgrade of Rail"}))
+
     def test_to_dict_structure(self):
         tender = TransnetTender(
             title="Rail Upgrade",
@@ -54,8 +134,16 @@ class TestTransnetModels(unittest.TestCase):
         )
         data = tender.to_dict()
         self.assertEqual(data["title"], "Rail Upgrade")
+        self.assertEqual(data["tags"], [])
         self.assertEqual(data["supporting_docs"][0]["url"], "https://example.com")
         self.assertEqual(data["email"], "contact@transnet.co.za")
 
+    def test_to_dict_with_string_tags(self):
+        tender = TransnetTender.from_api_response({"rowKey": "abc123"})
+        tender.tags = ["Rail", "Infrastructure"]
+        data = tender.to_dict()
+        self.assertEqual(data["tags"], ["Rail", "Infrastructure"])
+        self.assertIsNot(data["tags"], tender.tags)
+
 if __name__ == '__main__':
     unittest.main()